@@ -22,21 +22,26 @@ def split_text_by_paragraphs_and_limit(text: str, limit: int) -> list[str]:
         return [text]
 
     paragraphs = text.split("\n\n")
-    for paragraph in paragraphs:
-        assert len(paragraph) <= limit, (len(paragraph), paragraph)
-
     result = []
-    current_part = ""
+    current_paragraphs = []
+    current_len = 0  # Note: This is tracked so as to not rebuild and remeasure the accumulated segment for each paragraph.
 
     for paragraph in paragraphs:
-        candidate = f"{current_part}\n\n{paragraph}" if current_part else paragraph
-
-        if len(candidate) > limit:
-            result.append(current_part)
-            current_part = paragraph
+        paragraph_len = len(paragraph)
+        assert paragraph_len <= limit, (paragraph_len, paragraph)  # Note: This is checked in the same pass that groups the paragraphs.
+        candidate_len = (current_len + 2 + paragraph_len) if current_len else paragraph_len
+
+        if candidate_len > limit:
+            result.append("\n\n".join(current_paragraphs))
+            current_paragraphs = [paragraph]
+            current_len = paragraph_len
+        elif current_len:
+            current_paragraphs.append(paragraph)
+            current_len = candidate_len
         else:
-            current_part = candidate
+            current_paragraphs = [paragraph]
+            current_len = candidate_len
 
-    if current_part:
-        result.append(current_part)
+    if current_len:
+        result.append("\n\n".join(current_paragraphs))
     return result
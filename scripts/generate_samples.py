@@ -1,57 +1,76 @@
+import concurrent.futures
 import re
 
+import click
+
 from podgenai.config import REPO_PATH
 from podgenai import generate_media
 
+_SAMPLE_NAME_PATTERN = re.compile(r"\|\s*\[([^\]]+)\]")
+
 
 def list_sample_topics_from_readme() -> list[str]:
     """Return the list of topics from the "Samples" section in the repository's README.md file.
 
-    This function specifically looks for the "Samples" section in the text.
-    It then identifies the markdown table within this section and extracts all entries under the
-    "Name" column. The assumption is that the table is well-formed according to markdown standards
-    and that the "Name" column contains markdown links with the names being the link text.
-
-    In essence, the approach involves:
-    1. Using a regular expression to locate the "Samples" section by finding the heading and
-       capturing the content until the next level 2 heading or the end of the content.
-    2. Extracting the portion of text that corresponds to the table under the "Samples" section.
-    3. Using another regular expression to find all instances of markdown link texts in the "Name" column
-       of the table. This is based on the markdown link syntax `[link text](URL)`.
+    The "Samples" section is scanned line by line, from its level 2 heading up to the next level 2 heading or the end of the file.
+    Within it, the names are extracted from the table rows, assuming the "Name" column contains markdown links with the names being the link text, i.e. `[link text](URL)`.
     """
     readme_path = REPO_PATH / "README.md"
-    readme_text = readme_path.read_text()
-
-    # Find the section starting with "## Samples" and take the content up to the next level 2 heading
-    match = re.search(r"## Samples\n(.*?)(\n## |\Z)", readme_text, re.DOTALL)
-    assert match
-
-    # Extract the table part
-    samples_section = match.group(1)
-
-    # Match all names in the "Name" column assuming they're in markdown link format [text](url)
-    names = re.findall(r"\|\s*\[([^\]]+)\]", samples_section)
-
-    # Validate names
-    for name in names:
-        assert name == name.strip()
-    assert len(names) == len(set(names))
+    names = []
+    seen = set()
+    in_samples_section = False
+    for line in readme_path.read_text().splitlines():
+        if line.startswith("## "):
+            if in_samples_section:
+                break
+            in_samples_section = line == "## Samples"
+        elif in_samples_section and line.lstrip().startswith("|"):
+            for name in _SAMPLE_NAME_PATTERN.findall(line):
+                assert not (name[0].isspace() or name[-1].isspace()), name  # Note: The name is never empty, as per the pattern.
+                assert name not in seen, name
+                seen.add(name)
+                names.append(name)
+    assert in_samples_section
 
     return names
 
 
-def generate_samples(**kwargs) -> None:
+def generate_samples(*, max_workers: int = 1, **kwargs) -> None:
     """Generate the media for sample topics listed in the readme.
 
     This can be applicable as a step toward updating the samples.
 
+    If `max_workers` is greater than 1, up to that many topics are generated concurrently, in which case confirmation is unsupported.
+    Note that each generation additionally uses its own workers, as configured.
+
     If a generation fails, all remaining topics are skipped.
     """
+    assert max_workers >= 1
     topics = list_sample_topics_from_readme()
-    for topic in topics:
-        if not generate_media(topic, **kwargs):
-            break
+    if max_workers == 1:
+        for topic in topics:
+            if not generate_media(topic, **kwargs):
+                break
+        return
+
+    assert not kwargs.get("confirm"), "Confirmation is unsupported when generating concurrently."
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(generate_media, topic, **kwargs) for topic in topics]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                if not future.result():
+                    break
+        finally:
+            for future in futures:
+                future.cancel()  # Note: This skips the topics that have not yet started.
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"], "max_content_width": 120})
+@click.option("--workers", "-w", default=1, type=click.IntRange(min=1), help="Maximum number of topics to generate concurrently. If 1, confirmation is sought before generation, and this is the default.")
+def main(workers: int) -> None:
+    """Generate the media for sample topics listed in the readme."""
+    generate_samples(max_workers=workers, confirm=workers == 1)
 
 
 if __name__ == "__main__":
-    generate_samples(confirm=True)
+    main()
@@ -1,9 +1,16 @@
+import os
+from pathlib import Path
 import re
+from typing import Callable
 
 from podgenai.config import PROMPTS
 from podgenai.content.topic import get_topic
 from podgenai.work import get_topic_work_path
 
+_TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\s+")
+_HTML_DESCRIPTION_PREFIX = "<p><strong>Sections</strong>:</p>\n<ol>\n"
+_HTML_DESCRIPTION_SUFFIX = f"\n</ol>\n<p><br></p><p><strong>Disclaimer</strong>: <em>{PROMPTS['tts_disclaimer']}</em></p>"
+
 
 def _lstrip_optional_timestamp(topic: str) -> str:
     """Return the topic after stripping any optional leading timestamp.
@@ -12,22 +19,62 @@ def _lstrip_optional_timestamp(topic: str) -> str:
         '2024-04-23T19:31:12 Living a good life' -> 'Living a good life'
         'Living a good life' -> 'Living a good life'
     """
-    pattern = r"(?:(?:\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\s+))?(?P<topic>.*)"
-    match = re.fullmatch(pattern, topic)
-    return match.group("topic")
+    if not topic[:1].isdigit():
+        return topic
+    match = _TIMESTAMP_PATTERN.match(topic)
+    return topic[match.end() :] if match else topic
 
 
 def _get_denumbered_subsections(lines: list[str]) -> list[str]:
-    return [line[line.find(" ") + 1 :] if line.find(".") != -1 else line for line in lines]
+    """Return the lines after stripping any leading section number.
+
+    Examples:
+        '2. Beta. Gamma' -> 'Beta. Gamma'
+        'Beta. Gamma' -> 'Beta. Gamma'
+    """
+    denumbered_lines = []
+    for line in lines:
+        number, separator, name = line.partition(". ")
+        denumbered_lines.append(name if (separator and number.isdigit()) else line)
+    return denumbered_lines
+
+
+def _format_html_description(topic: str, subtopics_text: str) -> str:
+    denumbered_subtopics_list = _get_denumbered_subsections(subtopics_text.split("\n"))
+    subtopics_list_html = "\n".join(f"  <li>{s}</li>" for s in denumbered_subtopics_list)
+    return _HTML_DESCRIPTION_PREFIX + subtopics_list_html + _HTML_DESCRIPTION_SUFFIX
+
+
+def _format_plain_description(topic: str, subtopics_text: str) -> str:
+    return f"Sections:\n\n{subtopics_text}"
+
+
+def _format_llm_description(topic: str, subtopics_text: str) -> str:
+    return f"{topic}\n\nSections:\n{subtopics_text}"
+
+
+_DESCRIPTION_FORMATTERS: dict[str, Callable[[str, str], str]] = {
+    "html": _format_html_description,
+    "plain": _format_plain_description,
+    "text": _format_plain_description,
+    "txt": _format_plain_description,
+    "llm": _format_llm_description,
+    "gpt": _format_llm_description,
+}
 
 
 def get_cached_episode_description_html(topic: str, fmt: str = "html") -> str:
+    formatter = _DESCRIPTION_FORMATTERS.get(fmt)
+    if not formatter:
+        raise ValueError(f"Invalid format: {fmt}. It must be one of: {', '.join(_DESCRIPTION_FORMATTERS)}")
+
     topic = _lstrip_optional_timestamp(topic)
     work_path = get_topic_work_path(topic, create=False)
     if not work_path.is_dir():
         raise LookupError(f"Work path does not exist for topic: {topic}")
 
-    subtopics_list_files = list(work_path.glob("0. list_subtopics *.txt"))
+    with os.scandir(work_path) as entries:
+        subtopics_list_files = [Path(e.path) for e in entries if e.name.startswith("0. list_subtopics ") and e.name.endswith(".txt") and e.is_file(follow_symlinks=False)]
     num_subtopics_list_files = len(subtopics_list_files)
     if num_subtopics_list_files == 0:
         raise LookupError(f"No subtopic list exists for topic: {topic}")
@@ -37,22 +84,9 @@ def get_cached_episode_description_html(topic: str, fmt: str = "html") -> str:
     assert num_subtopics_list_files == 1
     subtopics_list_file = subtopics_list_files[0]
     subtopics_text = subtopics_list_file.read_text().strip()
-    subtopics_list = subtopics_text.split("\n")
-    assert subtopics_list
-
-    match fmt:
-        case "html":
-            denumbered_subtopics_list = _get_denumbered_subsections(subtopics_list)
-            subtopics_list_html = "\n".join(f"  <li>{s}</li>" for s in denumbered_subtopics_list)
-            description = f"<p><strong>Sections</strong>:</p>\n<ol>\n{subtopics_list_html}\n</ol>\n<p><br></p><p><strong>Disclaimer</strong>: <em>{PROMPTS['tts_disclaimer']}</em></p>"
-        case "plain" | "text" | "txt":
-            description = f"Sections:\n\n{subtopics_text}"
-        case "llm" | "gpt":
-            description = f"{topic}\n\nSections:\n{subtopics_text}"
-        case _:
-            assert False, fmt
-
-    return description
+    assert subtopics_text
+
+    return formatter(topic, subtopics_text)
 
 
 def main():
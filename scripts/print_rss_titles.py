@@ -1,28 +1,24 @@
-import io
+from typing import BinaryIO, Iterator
 import urllib.request
 import xml.etree.ElementTree as ET
 
 RSS_URL = "https://anchor.fm/s/f4868644/podcast/rss"
 
 
-def get_url_content(url: str) -> str:
-    with urllib.request.urlopen(url) as response:
-        return response.read().decode()
-
-
-def extract_episode_titles(rss_content: str) -> list[str]:
-    tree = ET.parse(io.StringIO(rss_content))
-    root = tree.getroot()
-
-    episode_titles = [item.find("title").text for item in root.findall(".//item")]
-    return episode_titles
+def iter_episode_titles(rss_file: BinaryIO) -> Iterator[str]:
+    # Note: The content is parsed as bytes so that the parser decodes it as per its declared encoding. It is parsed incrementally as it is read, with each item being cleared after use.
+    for _event, element in ET.iterparse(rss_file, events=("end",)):
+        if element.tag == "item":
+            title = element.findtext("title")
+            if title is not None:
+                yield title
+            element.clear()
 
 
 def main():
-    content = get_url_content(RSS_URL)
-    titles = extract_episode_titles(content)
-    for title in titles:
-        print(title)
+    with urllib.request.urlopen(RSS_URL) as response:
+        for title in iter_episode_titles(response):
+            print(title)
 
 
 if __name__ == "__main__":
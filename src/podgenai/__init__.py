@@ -1 +1,13 @@
-from podgenai.podgenai import generate_media  # noqa: F401
+__all__ = ["generate_media"]
+
+
+def __getattr__(name: str):
+    """Return the lazily imported public attribute.
+
+    This defers importing the `openai` package, which is slow to import, until it is needed, thereby keeping the CLI help fast.
+    """
+    if name == "generate_media":
+        from podgenai.podgenai import generate_media
+
+        return generate_media
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,9 +6,7 @@ import click
 
 import podgenai.exceptions
 from podgenai.config import NUM_SECTIONS_MIN, NUM_SECTIONS_MAX
-from podgenai.podgenai import generate_media
 from podgenai.content.topic import get_topic, ensure_topic_is_valid
-from podgenai.util.openai import ensure_openai_key
 from podgenai.util.sys import print_error
 
 
@@ -38,6 +36,9 @@ from podgenai.util.sys import print_error
 )
 def main(topic: Optional[str], path: Optional[Path], max_sections: Optional[int], markers: bool, confirm: bool) -> None:
     """Generate and write an audiobook podcast mp3 file for the given topic to the given output file path."""
+    from podgenai.podgenai import generate_media  # Note: This is imported lazily because it is slow to import due to the openai package, and it is unnecessary for the help.
+    from podgenai.util.openai import ensure_openai_key
+
     try:
         ensure_openai_key()
 
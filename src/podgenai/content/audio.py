@@ -1,6 +1,7 @@
-import datetime
 from pathlib import Path
+import shutil
 import subprocess
+import time
 from typing import Optional
 
 import pathvalidate
@@ -11,7 +12,7 @@ from podgenai.work import get_topic_work_path
 
 def get_default_output_filename(topic: str) -> str:
     """Return the default output filename for the given topic."""
-    now = datetime.datetime.now().isoformat(timespec="seconds")
+    now = time.strftime("%Y-%m-%dT%H:%M:%S")  # Note: This is equivalent to `datetime.datetime.now().isoformat(timespec="seconds")`.
     output_filename = f"{now} {topic}.mp3"
     output_filename = pathvalidate.sanitize_filename(output_filename, platform="auto")
     return output_filename
@@ -36,12 +37,22 @@ def get_output_file_path(output_path: Optional[Path], *, topic: str) -> Path:
 
 
 def merge_speech_paths(paths: list[Path], *, topic: str, output_path: Path) -> None:
-    """Merge the ordered list of preexisting audio file paths for the given topic to a single audio file having the given output file path."""
+    """Merge the ordered list of preexisting audio file paths for the given topic to a single audio file having the given output file path.
+
+    If there is only a single path, it is copied instead, with there being nothing to merge.
+    """
+    num_paths = len(paths)
+    if num_paths == 1:
+        print("Copying single speech part.")
+        shutil.copyfile(paths[0], output_path)
+        print("Copied single speech part.")
+        return
+
     work_path = get_topic_work_path(topic)
-    ffmpeg_paths = [str(p).replace("'", "'\\''") for p in paths]
+    ffmpeg_paths = [str(p).replace("'", "'\\''") for p in paths]  # Note: This escapes single quotes as per the ffmpeg concat demuxer.
     ffmpeg_filelist_path = work_path / "ffmpeg.list"
-    ffmpeg_filelist_path.write_text("\n".join(f"file '{p}'" for p in ffmpeg_paths))
-    print(f"Merging {len(paths)} speech parts.")
-    subprocess.run(["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(ffmpeg_filelist_path), "-c", "copy", "-loglevel", "error", str(output_path)], check=True)
+    ffmpeg_filelist_path.write_text("".join(f"file '{p}'\n" for p in ffmpeg_paths))
+    print(f"Merging {num_paths} speech parts.")
+    subprocess.run(["ffmpeg", "-nostdin", "-hide_banner", "-y", "-f", "concat", "-safe", "0", "-i", str(ffmpeg_filelist_path), "-c", "copy", "-loglevel", "error", str(output_path)], check=True, stdout=subprocess.DEVNULL)  # Note: stderr is inherited for any errors to be seen.
     assert output_path.exists()
-    print(f"Merged {len(paths)} speech parts.")
+    print(f"Merged {num_paths} speech parts.")
@@ -1,54 +1,52 @@
 import concurrent.futures
-import contextlib
-import io
+import functools
 from typing import Optional
 
 import podgenai.exceptions
 from podgenai.config import MAX_CONCURRENT_WORKERS, PROMPTS, NUM_SECTIONS_MIN, NUM_SECTIONS_MAX
+from podgenai.util.binascii import hasher
 from podgenai.util.openai import get_cached_content
 from podgenai.work import get_topic_work_path
 from podgenai.util.sys import print_error, print_warning
 
 
-def is_subtopics_list_valid(subtopics: list[str], max_sections: Optional[int]) -> bool:
-    """Return true if the subtopics are structurally valid, otherwise false.
-
-    A validation error is printed if a subtopic is invalid.
-    """
+def get_subtopics_list_error(subtopics: list[str], max_sections: Optional[int]) -> Optional[str]:
+    """Return the validation error if the subtopics are structurally invalid, otherwise `None`."""
     if not subtopics:
-        print_error("No subtopics exist.")
-        return False
+        return "No subtopics exist."
 
     if max_sections is not None:
         if len(subtopics) > max_sections:
-            print_error(f"Up to {max_sections} subtopics are allowed, but {len(subtopics)} exist.")
-            return False
+            return f"Up to {max_sections} subtopics are allowed, but {len(subtopics)} exist."
 
     seen = set()
     for num, subtopic in enumerate(subtopics, start=1):
         if subtopic != subtopic.strip():
-            print_error(f"Subtopic {num} is invalid because it has leading or trailing whitespace: {subtopic!r}")
-            return False
+            return f"Subtopic {num} is invalid because it has leading or trailing whitespace: {subtopic!r}"
 
-        expected_num_prefix = f"{num}. "
-        if not subtopic.startswith(expected_num_prefix):
-            print_error(f"Subtopic {num} is invalid because it is not numbered correctly: {subtopic}")
-            return False
+        subtopic_num, separator, subtopic_name = subtopic.partition(". ")
+        if (not separator) or (subtopic_num != str(num)):
+            return f"Subtopic {num} is invalid because it is not numbered correctly: {subtopic}"
 
-        subtopic_name = subtopic.removeprefix(expected_num_prefix).strip()
+        subtopic_name = subtopic_name.strip()  # Note: Only leading whitespace can remain here, as trailing whitespace is already disallowed.
         if not subtopic_name:
-            print_error(f"Subtopic {num} is invalid because it has no value: {subtopic}")
-            return False
-
-        if subtopic_name != subtopic_name.lstrip():
-            print_error(f"Subtopic {num} is invalid because its name has leading whitespace: {subtopic!r}")
-            return False
+            return f"Subtopic {num} is invalid because it has no value: {subtopic}"
 
         if subtopic_name in seen:
-            print_error(f"Subtopic {num} is invalid because its name is a duplicate: {subtopic}")
-            return False
+            return f"Subtopic {num} is invalid because its name is a duplicate: {subtopic}"
         seen.add(subtopic_name)
 
+    return None
+
+
+def is_subtopics_list_valid(subtopics: list[str], max_sections: Optional[int]) -> bool:
+    """Return true if the subtopics are structurally valid, otherwise false.
+
+    A validation error is printed if a subtopic is invalid.
+    """
+    if error := get_subtopics_list_error(subtopics, max_sections):
+        print_error(error)
+        return False
     return True
 
 
@@ -87,13 +85,9 @@ def list_subtopics(topic: str, max_sections: Optional[int] = None, max_attempts:
                 continue
         assert not response.lower().startswith(rejection_error_prefix.lower()), response
 
-        subtopics = [s.strip() for s in response.splitlines() if s.strip().lower() not in invalid_subtopics]  # Note: A terminal "None" line has been observed with valid subtopics before it.
+        subtopics = [stripped for s in response.splitlines() if (stripped := s.strip()).lower() not in invalid_subtopics]  # Note: A terminal "None" line has been observed with valid subtopics before it.
 
-        error = io.StringIO()
-        with contextlib.redirect_stderr(error):
-            subtopics_list_is_valid = is_subtopics_list_valid(subtopics, max_sections)
-        if not subtopics_list_is_valid:
-            error = error.getvalue().rstrip().removeprefix("Error: ")
+        if error := get_subtopics_list_error(subtopics, max_sections):
             if num_attempt == max_attempts:
                 raise podgenai.exceptions.LanguageModelOutputStructureError(error)
             else:
@@ -107,35 +101,40 @@ def list_subtopics(topic: str, max_sections: Optional[int] = None, max_attempts:
     return subtopics
 
 
-def is_subtopic_text_valid(text: str, numbered_name: str) -> bool:
-    """Return true if the subtopic text is structurally valid, otherwise false.
-
-    A validation error is printed if the subtopic text is invalid.
-    """
+def get_subtopic_text_error(text: str, numbered_name: str) -> Optional[str]:
+    """Return the validation error if the subtopic text is structurally invalid, otherwise `None`."""
     if not text:
-        print_error(f"Subtopic {numbered_name!r} is empty.")
-        return False
+        return f"Subtopic {numbered_name!r} is empty."
 
     if text != text.rstrip():
-        print_error(f"Subtopic {numbered_name!r} has leading or trailing whitespace.")
-        return False
+        return f"Subtopic {numbered_name!r} has leading or trailing whitespace."
 
     checked_text = "\n" + text
     if "\n```" in checked_text:
-        print_error(f"Subtopic {numbered_name!r} may contain a code block.")
-        return False
+        return f"Subtopic {numbered_name!r} may contain a code block."
     if ("\n## " in checked_text) or ("\n### " in checked_text):
-        print_error(f"Subtopic {numbered_name!r} may contain a markdown section header.")
-        return False
+        return f"Subtopic {numbered_name!r} may contain a markdown section header."
 
+    return None
+
+
+def is_subtopic_text_valid(text: str, numbered_name: str) -> bool:
+    """Return true if the subtopic text is structurally valid, otherwise false.
+
+    A validation error is printed if the subtopic text is invalid.
+    """
+    if error := get_subtopic_text_error(text, numbered_name):
+        print_error(error)
+        return False
     return True
 
 
 def get_subtopic(*, topic: str, subtopics: list[str], subtopic: str, strategy: str = "oneshot", max_attempts: int = 3) -> str:
     """Return the full text for a given subtopic within the context of the given topic and list of subtopics."""
     assert subtopic[0].isdigit()  # Is numbered.
-    common_kwargs = {"strategy": strategy, "cache_key_prefix": subtopic, "cache_path": get_topic_work_path(topic)}
     subtopics_str = "\n".join(subtopics)
+    common_kwargs = {"strategy": strategy, "cache_key_prefix": subtopic, "cache_path": get_topic_work_path(topic), "prompt_cache_key": hasher(f"{topic}\n{subtopics_str}")}
+    # Note: The prompt is structured such that only the numbered subtopic at its end varies across the subtopics of a topic. This keeps the long prompt prefix shared, and so cacheable by the API, with the prompt cache key routing these requests together.
 
     for num_attempt in range(1, max_attempts + 1):
         match strategy:
@@ -149,11 +148,7 @@ def get_subtopic(*, topic: str, subtopics: list[str], subtopic: str, strategy: s
                 assert ValueError(f"Invalid strategy: {strategy}")
         text = text.rstrip()
 
-        error = io.StringIO()
-        with contextlib.redirect_stderr(error):
-            subtopic_text_is_valid = is_subtopic_text_valid(text, numbered_name=subtopic)
-        if not subtopic_text_is_valid:
-            error = error.getvalue().rstrip().removeprefix("Error: ")
+        if error := get_subtopic_text_error(text, numbered_name=subtopic):  # Note: The error is returned rather than captured from stderr, as redirecting stderr is not thread-safe with concurrent subtopics.
             if num_attempt == max_attempts:
                 raise podgenai.exceptions.LanguageModelOutputStructureError(error)
             else:
@@ -173,13 +168,21 @@ def get_subtopics_texts(*, topic: str, subtopics: Optional[list[str]] = None) ->
     """
     if not subtopics:
         subtopics = list_subtopics(topic)
-    if MAX_CONCURRENT_WORKERS == 1:
-        subtopics_texts = {s: get_subtopic(topic=topic, subtopics=subtopics, subtopic=s) for s in subtopics}
+    fn_get_subtopic = functools.partial(get_subtopic, topic=topic, subtopics=subtopics)
+    if (MAX_CONCURRENT_WORKERS == 1) or (len(subtopics) == 1):  # Note: An executor is not used for a single subtopic as there is nothing to parallelize.
+        subtopics_texts = {s: fn_get_subtopic(subtopic=s) for s in subtopics}
     else:
         assert MAX_CONCURRENT_WORKERS > 1
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WORKERS) as executor:
-            fn_get_subtopic = lambda subtopic: get_subtopic(topic=topic, subtopics=subtopics, subtopic=subtopic)
-            subtopics_texts = {s: text for s, text in zip(subtopics, executor.map(fn_get_subtopic, subtopics))}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_WORKERS, len(subtopics))) as executor:
+            futures = {executor.submit(fn_get_subtopic, subtopic=s): subtopic_idx for subtopic_idx, s in enumerate(subtopics)}
+            texts = [None] * len(subtopics)
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    texts[futures[future]] = future.result()  # Note: A failure is raised as soon as it occurs rather than after the preceding subtopics complete.
+            finally:
+                for future in futures:
+                    future.cancel()  # Note: This skips the subtopics that have not yet started if a failure occurs.
+        subtopics_texts = dict(zip(subtopics, texts, strict=True))
     return subtopics_texts
 
 
@@ -194,23 +197,27 @@ def get_subtopics_speech_texts(*, topic: str, subtopics: Optional[list[str]] = N
         subtopics = list_subtopics(topic)
     subtopics_texts = get_subtopics_texts(topic=topic, subtopics=subtopics)
 
-    mark = (lambda marker: marker) if markers else (lambda marker: "")
-    demark = (lambda marker: "") if markers else (lambda marker: marker)
+    disclaimer = PROMPTS["tts_disclaimer"]
+    section_prefix = "Section " if markers else ""
+    leading_disclaimer = f"{disclaimer} {{pause}}\n\n" if markers else ""
+    ending = "\n\nThe end." if markers else f"\n\n{{pause}}\n{disclaimer}"
+    # Note: These fragments are invariant across subtopics, and so they are computed once.
 
     process_subtopic_name = (lambda subtopic_name: subtopic_name.replace(".", ":", 1)) if markers else (lambda subtopic_name: subtopic_name.partition(". ")[2])
     # Note: The section number is removed altogether from the subtopic name if markers are disabled. This is because the number risks not being correctly spoken in an intended foreign language, especially so for non-Latin languages.
 
-    subtopics_speech_texts = {subtopic_name: f'{mark('Section ')}{process_subtopic_name(subtopic_name)}:\n\n{subtopic_text} {{pause}}' for subtopic_name, subtopic_text in subtopics_texts.items()}
+    speech_texts = ["".join((section_prefix, process_subtopic_name(subtopic_name), ":\n\n", subtopic_text, " {pause}")) for subtopic_name, subtopic_text in subtopics_texts.items()]
     # Note: A pause at the beginning is skipped by the TTS generator, but it is not skipped if at the end, and so it is kept at the end.
 
-    subtopics_speech_texts[subtopics[0]] = f'{topic}:\n\n{{pause}}\n{mark(f'{PROMPTS['tts_disclaimer']} {{pause}}\n\n')}{subtopics_speech_texts[subtopics[0]]}'
+    speech_texts[0] = "".join((topic, ":\n\n{pause}\n", leading_disclaimer, speech_texts[0]))
     # Note: TTS disclaimer about AI generated audio is required by OpenAI as per https://platform.openai.com/docs/guides/text-to-speech/do-i-own-the-outputted-audio-files
     # Note: It has proven more reliable for the pause to be structured in this way for section 1, rather than be in the leading topic line.
     # Note: If markers are disabled, such as for foreign language use, the disclaimer is skipped from the beginning of the first section (to the end of the last section)
     #       because otherwise the disclaimer can risk conditioning the TTS to speak "1" in English instead of in the foreign language.
 
-    subtopics_speech_texts[subtopics[-1]] = f"{subtopics_speech_texts[subtopics[-1]]}{mark('\n\nThe end.')}{demark(f'\n\n{{pause}}\n{PROMPTS['tts_disclaimer']}')}"
+    speech_texts[-1] += ending
     # Note: "The end." sounds better with the paragraph break before it.
     # Note: Square brackets around "The end." caused the TTS to skip the enclosed text at times.
 
+    subtopics_speech_texts = dict(zip(subtopics_texts, speech_texts, strict=True))  # Note: The texts are built as a list and keyed only once, with the first and last ones being patched by index.
     return subtopics_speech_texts
@@ -4,6 +4,8 @@ import io
 import podgenai.exceptions
 from podgenai.util.sys import print_error
 
+LINE_BOUNDARIES = frozenset("\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029")  # Note: These are the line boundaries of `str.splitlines`.
+
 
 def is_topic_valid(topic: str) -> bool:
     """Return true if the topic is structurally valid, otherwise false.
@@ -22,10 +24,10 @@ def is_topic_valid(topic: str) -> bool:
     if len(topic) < 2:
         print_error("Topic must be at least two characters long.")
         return False
-    if len(topic.splitlines()) > 1:
+    if not LINE_BOUNDARIES.isdisjoint(topic):  # Note: This stops at the first line boundary without splitting the topic into lines.
         print_error("Topic must be in a single line.")
         return False
-    if (topic[0] == topic[-1] == "'") or (topic[0] == topic[-1] == '"'):
+    if (topic[0] == topic[-1]) and (topic[0] in "'\""):
         print_error("Topic must not be quoted.")
         return False
     if topic[-1] == ":":
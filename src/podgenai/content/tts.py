@@ -37,11 +37,25 @@ def ensure_speech_audio_files(parts: dict[Path, str], voice: str) -> None:
 
     If a given file path already exists, it is not rewritten. If it does not exist, it is written.
     """
-    if MAX_CONCURRENT_WORKERS == 1:
+    pending_parts = {}
+    for part_path, part_text in parts.items():
+        if part_path.exists():  # Note: This is checked before dispatch so that no worker is used for a preexisting file, as is typical when rerunning a topic.
+            assert part_path.is_file()
+            print(f"Speech audio file exists on disk for: {part_path.stem}")
+        else:
+            pending_parts[part_path] = part_text
+    parts = pending_parts
+
+    max_workers = min(MAX_CONCURRENT_WORKERS, len(parts))
+    if max_workers <= 1:
         for part_path, part_text in parts.items():
             ensure_speech_audio(part_text, path=part_path, voice=voice)
     else:
-        assert MAX_CONCURRENT_WORKERS > 1
-        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WORKERS) as executor:
-            fn_ensure_speech_audio = lambda part_path: ensure_speech_audio(parts[part_path], path=part_path, voice=voice)
-            list(executor.map(fn_ensure_speech_audio, parts))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(ensure_speech_audio, part_text, path=part_path, voice=voice) for part_path, part_text in parts.items()]
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()  # Note: A failure is raised as soon as it occurs rather than after the preceding parts complete.
+            finally:
+                for future in futures:
+                    future.cancel()  # Note: This skips the parts that have not yet started if a failure occurs.
@@ -3,11 +3,7 @@ import binascii
 
 def crc32(text: str) -> str:
     """Return the CRC32 hash of the given string as a hexadecimal string."""
-    data: bytes = text.encode()
-    crc: int = binascii.crc32(data)
-    crc: str = f"{crc:08x}"
-    assert len(crc) == 8
-    return crc
+    return format(binascii.crc32(text.encode()), "08x")  # Note: The CRC is unsigned and fits in 32 bits, so this is always eight characters.
 
 
 hasher = crc32
@@ -1,8 +1,15 @@
 import dotenv
 
 
-def load_dotenv():
-    """Load the .env file normally and also from the current directory."""
+def load_dotenv() -> None:
+    """Load the .env file normally and also from the current directory.
+
+    The file from the current directory is loaded only if it is a different file.
+    """
     # Ref: https://stackoverflow.com/a/78972639/
-    dotenv.load_dotenv()
-    dotenv.load_dotenv(dotenv.find_dotenv(usecwd=True))
+    path = dotenv.find_dotenv()
+    if path:
+        dotenv.load_dotenv(path)
+    cwd_path = dotenv.find_dotenv(usecwd=True)
+    if cwd_path and (cwd_path != path):
+        dotenv.load_dotenv(cwd_path)
@@ -2,19 +2,21 @@ from typing import Optional
 
 import podgenai.exceptions
 
+_ACCEPT = frozenset({"y", "yes"})
+_REJECT = frozenset({"n", "no"})
+
 
 def get_confirmation(next_task: Optional[str] = None) -> None:
     """Receive input confirmation from the user, optionally for the specified next task.
 
-    If confirmation is refused, `InputError` is raised.
+    If confirmation is refused, `InputError` is raised. If the response is unrecognized, the user is prompted again.
     """
     task_prompt = f" with {next_task}" if next_task else ""
     user_prompt = f"Continue{task_prompt}? [y/n]: "
     while True:
-        response = input(user_prompt)
-        response = response.strip().lower()
-        match response:
-            case "y" | "yes":
-                break
-            case "n" | "no":
-                raise podgenai.exceptions.InputError("User canceled.")
+        response = input(user_prompt).strip().lower()
+        if response in _ACCEPT:
+            return
+        if response in _REJECT:
+            raise podgenai.exceptions.InputError("User canceled.")
+        print("Please answer y or n.")
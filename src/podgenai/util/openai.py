@@ -1,3 +1,5 @@
+import functools
+import importlib.util
 import os
 from pathlib import Path
 from typing import Optional
@@ -6,16 +8,16 @@ import openai
 import pathvalidate
 
 import podgenai.exceptions
-from podgenai.config import PROMPTS
-from podgenai.util.dotenv_ import load_dotenv
+from podgenai.config import PROMPTS  # Note: Importing podgenai.config also loads the .env file, and so it is not loaded again here.
 from podgenai.util.binascii import hasher
 from podgenai.util.sys import print_warning
 
-load_dotenv()
-
 ChatCompletion = openai.types.chat.chat_completion.ChatCompletion
 OpenAI = openai.OpenAI
 
+MULTIPART_ENDINGS = ("Done", "Done.", "done", "done.")  # Note: These are the completions that signal the end of a multipart response.
+MULTIPART_ENDING_SUFFIXES = tuple(f"{separator}{ending}" for ending in MULTIPART_ENDINGS for separator in (" ", "\n"))
+MAX_RETRIES = 6  # Note: The client default of 2 is insufficient when many concurrent requests encounter openai.RateLimitError.
 MAX_TTS_INPUT_LEN = 4096
 MODELS = {
     "text": "gpt-4o-2024-11-20",
@@ -45,17 +47,32 @@ def ensure_openai_key() -> None:
         raise podgenai.exceptions.EnvError("The environment variable OPENAI_API_KEY is unavailable. It can optionally be defined in an .env file.")
 
 
+@functools.cache
 def get_openai_client() -> OpenAI:
-    """Return the OpenAI client."""
-    return OpenAI()
+    """Return the shared OpenAI client.
+
+    The client is thread-safe. Sharing it allows its pooled HTTP connections to be reused across concurrent and subsequent requests, avoiding a new connection and TLS handshake per request.
+    If the optional `h2` package is installed, HTTP/2 is used, multiplexing the concurrent requests over fewer connections.
+    Requests failing due to rate limits or other transient errors are retried up to `MAX_RETRIES` times by the client with exponential backoff, respecting any retry delay suggested by the API.
+    """
+    http_client = openai.DefaultHttpxClient(http2=True) if importlib.util.find_spec("h2") else None  # Note: DefaultHttpxClient retains the default timeout and connection limits of the client.
+    return OpenAI(max_retries=MAX_RETRIES, http_client=http_client)
+
+
+def _get_prompt_cache_body(prompt_cache_key: Optional[str]) -> Optional[dict]:
+    """Return the extra request body for the given optional prompt cache key."""
+    return {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else None  # Note: This is sent as an extra body parameter as it is not a named parameter in older versions of the openai package.
 
 
-def get_completion(prompt: str, *, client: Optional[OpenAI] = None) -> ChatCompletion:
-    """Return the completion for the given prompt."""
+def get_completion(prompt: str, *, client: Optional[OpenAI] = None, prompt_cache_key: Optional[str] = None) -> ChatCompletion:
+    """Return the completion for the given prompt.
+
+    If `prompt_cache_key` is specified, it is sent to the API to improve the routing of requests sharing a long common prompt prefix, and thereby their rate of prompt cache hits.
+    """
     if not client:
         client = get_openai_client()
     # print(f"Requesting completion for prompt of length {len(prompt)}.")
-    completion = client.chat.completions.create(model=MODELS["text"], messages=[{"role": "user", "content": prompt}])
+    completion = client.chat.completions.create(model=MODELS["text"], messages=[{"role": "user", "content": prompt}], extra_body=_get_prompt_cache_body(prompt_cache_key))
     # Note: Specifying max_tokens=4096 with gpt-4-turbo-preview did not benefit in increasing output length, and a higher value is disallowed. Ref: https://platform.openai.com/docs/api-reference/chat/create
 
     if completion.usage and completion.usage.prompt_tokens_details and ((num_cached_prompt_tokens := completion.usage.prompt_tokens_details.cached_tokens) > 0):
@@ -66,7 +83,7 @@ def get_completion(prompt: str, *, client: Optional[OpenAI] = None) -> ChatCompl
     return completion
 
 
-def get_multipart_messages(prompt: str, *, max_completions: int = 10, client: Optional[OpenAI] = None, update_prompt: bool = False, continuation: str = PROMPTS["continuation_next"]) -> list[dict]:
+def get_multipart_messages(prompt: str, *, max_completions: int = 10, client: Optional[OpenAI] = None, update_prompt: bool = False, continuation: str = PROMPTS["continuation_next"], prompt_cache_key: Optional[str] = None) -> list[dict]:
     """Return the multipart completion messages for the given initial prompt.
 
     After the initial completion, continuation prompts are subsequently given, either until the assistant is done, or until a maximum of `max_completions` are received, whichever is first.
@@ -75,10 +92,11 @@ def get_multipart_messages(prompt: str, *, max_completions: int = 10, client: Op
     If `update_prompt` is False, the initial prompt can be provided with an included continuation note.
 
     If `continuation` is specified, it is used iteratively as the continuation prompt, otherwise a default continuation prompt is used.
+
+    If `prompt_cache_key` is specified, it is forwarded as for `get_completion`.
     """
     if update_prompt:
         prompt = prompt + "\n\n" + PROMPTS["continuation_first"]
-    endings = ("Done", "Done.", "done", "done.")
 
     if not client:
         client = get_openai_client()
@@ -86,18 +104,16 @@ def get_multipart_messages(prompt: str, *, max_completions: int = 10, client: Op
     messages = [{"role": "user", "content": prompt}]
     for completion_num in range(1, max_completions + 1):
         # print(f"Requesting completion {completion_num} for initial prompt of length {len(prompt)}.")
-        completion = client.chat.completions.create(model=MODELS["text"], messages=messages)
+        completion = client.chat.completions.create(model=MODELS["text"], messages=messages, extra_body=_get_prompt_cache_body(prompt_cache_key))
         content = get_content(prompt="", completion=completion)
         messages.append({"role": "assistant", "content": content})
 
-        if content in endings:
+        if content in MULTIPART_ENDINGS:
             print(f"Completion {completion_num} is an ending.")
             return messages
-        else:
-            for ending in endings:
-                if content.endswith((f" {ending}", f"\n{ending}")):
-                    print(f"Completion {completion_num} has an ending.")
-                    return messages
+        elif content.endswith(MULTIPART_ENDING_SUFFIXES):
+            print(f"Completion {completion_num} has an ending.")
+            return messages
 
         if completion_num == max_completions:
             print_warning(f"The quota of a maximum of {max_completions} completions is exhausted for initial prompt of length {len(prompt)}.")
@@ -108,10 +124,10 @@ def get_multipart_messages(prompt: str, *, max_completions: int = 10, client: Op
     assert False
 
 
-def get_content(prompt: str, *, client: Optional[OpenAI] = None, completion: Optional[ChatCompletion] = None) -> str:
+def get_content(prompt: str, *, client: Optional[OpenAI] = None, completion: Optional[ChatCompletion] = None, prompt_cache_key: Optional[str] = None) -> str:
     """Return the content for the given prompt."""
     if not completion:
-        completion = get_completion(prompt, client=client)
+        completion = get_completion(prompt, client=client, prompt_cache_key=prompt_cache_key)
     content = completion.choices[0].message.content
     content = content.strip()
     assert content
@@ -125,7 +141,6 @@ def get_multipart_content(prompt: str, **kwargs) -> str:
 
     The completions are joined using paragraph breaks (double line breaks).
     """
-    endings = ("Done", "Done.", "done", "done.")
     messages = get_multipart_messages(prompt, **kwargs)
 
     completions = []
@@ -134,13 +149,11 @@ def get_multipart_content(prompt: str, **kwargs) -> str:
             continue
         completion = message["content"]
         assert completion == completion.strip()
-        if completion in endings:
+        if completion in MULTIPART_ENDINGS:
             assert message_count == len(messages), {"prompt": prompt, "messages": messages, "message_count": message_count, "completion": completion}
             break
-        for ending in endings:
-            if completion.endswith((f" {ending}", f"\n{ending}")):
-                completion = completion.removesuffix(ending).rstrip()
-                break
+        if completion.endswith(MULTIPART_ENDING_SUFFIXES):
+            completion = completion.rsplit(maxsplit=1)[0]  # Note: This removes the ending, which is preceded by whitespace, along with the whitespace.
         completions.append(completion)
 
     return "\n\n".join(completions).strip()
@@ -187,11 +200,13 @@ def get_cached_content(prompt: str, *, strategy: str = "oneshot", read_cache: bo
 def write_speech_audio(text: str, path: Path, *, voice: str = "default", client: Optional[OpenAI] = None) -> None:
     """Write the speech audio file for the given prompt to the given file path.
 
-    The prompt must not be longer than 4096 characters, as this is the maximum supported length by the client.
+    The prompt must not be longer than 4096 characters, as this is the maximum supported length by the client. If it is longer, `InputError` is raised without a request being made.
 
     `voice` can be one of the keys or values in TTS_VOICE_MAP, or one of the other supported voices.
     """
     assert path.suffix == ".mp3"
+    if (text_len := len(text)) > MAX_TTS_INPUT_LEN:
+        raise podgenai.exceptions.InputError(f"The speech text for {path.stem} is {text_len} characters long but it must not be longer than {MAX_TTS_INPUT_LEN} characters.")
     if not client:
         client = get_openai_client()
 
@@ -199,10 +214,12 @@ def write_speech_audio(text: str, path: Path, *, voice: str = "default", client:
     voice_str = voice if (voice == mapped_voice) else f"{voice} ({mapped_voice})"
 
     print(f"Requesting speech audio in {voice_str} voice for: {path.stem}")
-    response = client.audio.speech.create(model=MODELS["tts"], voice=mapped_voice, input=text)
-    # relative_path = path.relative_to(Path.cwd())
-    # print(f"Writing speech to: {relative_path}")
-    response.stream_to_file(path)
+    partial_path = path.with_name(f"{path.name}.part")
+    with client.audio.speech.with_streaming_response.create(model=MODELS["tts"], voice=mapped_voice, input=text) as response:
+        # relative_path = path.relative_to(Path.cwd())
+        # print(f"Writing speech to: {relative_path}")
+        response.stream_to_file(partial_path)  # Note: The audio is written as it is received rather than after being fully buffered in memory.
+    partial_path.replace(path)  # Note: This ensures that an interrupted download does not leave behind an incomplete file that would subsequently be treated as complete.
     assert path.exists(), path
     # print(f"Wrote speech to: {relative_path}")
     print(f"Received speech audio in {voice_str} voice for: {path.stem}")
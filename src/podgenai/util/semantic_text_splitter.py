@@ -1,9 +1,17 @@
+import functools
+
 from semantic_text_splitter import TextSplitter
 
 
+@functools.lru_cache(maxsize=4)
+def _get_text_splitter(limit: int) -> TextSplitter:
+    """Return the shared text splitter for the given character length limit."""
+    return TextSplitter(limit)
+
+
 def semantic_split(text: str, limit: int) -> list[str]:
     """Return a list of chunks from the given text, splitting it at semantically sensible boundaries while applying the specified character length limit for each chunk."""
     # Ref: https://stackoverflow.com/a/78288960/
-    splitter = TextSplitter(limit)
+    splitter = _get_text_splitter(limit)
     chunks = splitter.chunks(text)
     return chunks
@@ -1,3 +1,4 @@
+import functools
 from pathlib import Path
 
 import pathvalidate
@@ -6,14 +7,24 @@ from podgenai.config import WORK_PATH
 from podgenai.content.topic import ensure_topic_is_valid
 
 
-def get_topic_work_path(topic: str, create: bool = True) -> Path:
-    """Return the working directory for the given topic.
+@functools.lru_cache(maxsize=32)
+def _get_validated_topic_work_path(topic: str) -> Path:
+    """Return the validated working directory for the given topic without creating it.
 
-    If `create` is True, the directory is created if it does not already exist.
+    The result is cached because the validation is repeated for every subtopic and speech part of a topic.
     """
     ensure_topic_is_valid(topic)
     work_path = WORK_PATH / pathvalidate.sanitize_filename(topic, platform="auto")
     pathvalidate.validate_filepath(work_path, platform="auto")
+    return work_path
+
+
+def get_topic_work_path(topic: str, create: bool = True) -> Path:
+    """Return the working directory for the given topic.
+
+    If `create` is True, the directory is created if it does not already exist.
+    """
+    work_path = _get_validated_topic_work_path(topic)
     if create:
         work_path.mkdir(parents=True, exist_ok=True)
     return work_path